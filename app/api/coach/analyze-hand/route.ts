@@ -166,8 +166,26 @@ export async function POST(req: Request) {
       return NextResponse.json({ error: 'Unauthorized' }, { status: 401 });
     }
 
-    // Accept either { raw_text } or richer fields
-    const body = await req.json().catch(() => ({} as any));
+    // Accept either { raw_text } or richer fields.
+    // coach_worker can send the body gzipped (COACH_GZIP=true); fetch/Next
+    // don't gunzip request bodies for us, so handle it here. If a proxy
+    // already decompressed the body, gunzip fails and we parse it as-is.
+    let body: any;
+    if ((req.headers.get('content-encoding') || '').includes('gzip')) {
+      const { gunzipSync } = await import('zlib');
+      const raw = Buffer.from(await req.arrayBuffer());
+      try {
+        body = JSON.parse(gunzipSync(raw).toString('utf-8'));
+      } catch {
+        try {
+          body = JSON.parse(raw.toString('utf-8'));
+        } catch {
+          body = {} as any;
+        }
+      }
+    } else {
+      body = await req.json().catch(() => ({} as any));
+    }
     const story: string = asText(body?.raw_text || body?.text || '');
 
     if (!story.trim()) {
@@ -5,19 +5,23 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from coach_worker import get_pg_conn, load_env_file
 
+USER_ID = '740a2347-089c-4f8a-b276-39421e9dba66'
+
 def check_pending():
     load_env_file()
     conn = get_pg_conn()
     with conn.cursor() as cur:
+        # Matches the worker's pending predicate, so the partial index
+        # idx_hands_pending_by_created serves this count.
         cur.execute("""
-            SELECT count(*) 
-            FROM hands 
-            WHERE user_id = '740a2347-089c-4f8a-b276-39421e9dba66' 
+            SELECT count(*)
+            FROM hands
+            WHERE user_id = %s
               AND gto_strategy IS NULL
-        """)
+        """, (USER_ID,))
         count = cur.fetchone()['count']
         print(f"Pending hands: {count}")
-            
+
     conn.close()
 
 if __name__ == "__main__":
@@ -2,29 +2,60 @@
 """Quick script to check parsed replayer data for hero cards."""
 
 import os
+import sys
 import json
+import re
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
+HERO_RE = re.compile(
+    r"Dealt\s+to\s+Hero\s*\[\s*([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\s*\]",
+    re.IGNORECASE,
+)
+
 # Load env
-env_path = os.path.join(os.path.dirname(__file__), ".env")
-if os.path.exists(env_path):
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith("#") and "=" in line:
-                k, v = line.split("=", 1)
-                if k not in os.environ:
-                    os.environ[k.strip()] = v.strip()
+from envutil import load_env_file
+load_env_file()
 
 db_url = os.getenv("DATABASE_URL") or os.getenv("SUPABASE_DB_URL")
 conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
 
+if "--all" in sys.argv:
+    # Bulk mode: stream every hand through a server-side named cursor so the
+    # client never materializes the whole table. The single-row peek below
+    # stays on a plain client cursor (named cursors aren't worth it for LIMIT 1).
+    with conn:
+        cur = conn.cursor(name="check_replayer_stream")
+        cur.itersize = 1000
+        cur.execute("""
+            SELECT id, raw_text
+            FROM hands
+            WHERE replayer_data IS NOT NULL
+              AND replayer_data != '{}'::jsonb
+        """)
+        total = with_hero = 0
+        for row in cur:
+            total += 1
+            if HERO_RE.search(row["raw_text"] or ""):
+                with_hero += 1
+        cur.close()
+    print(f"Scanned {total} hands with replayer_data: {with_hero} have a 'Dealt to Hero' line")
+    conn.close()
+    sys.exit(0)
+
+# Project just the fields we print — JSONB extraction and the hero-line
+# regex run in Postgres, so the full replayer_data/raw_text blobs never
+# cross the wire.
 with conn.cursor() as cur:
-    cur.execute("""
-        SELECT id, replayer_data, raw_text 
-        FROM hands 
-        WHERE replayer_data IS NOT NULL 
+    cur.execute(r"""
+        SELECT id,
+               replayer_data->'players' AS players,
+               replayer_data->'board' AS board,
+               replayer_data->>'pot' AS pot,
+               replayer_data->>'dealerSeat' AS dealer_seat,
+               substring(raw_text from 'Dealt\s+to\s+Hero\s*\[[^\]]+\]') AS hero_line
+        FROM hands
+        WHERE replayer_data IS NOT NULL
           AND replayer_data != '{}'::jsonb
         LIMIT 1
     """)
@@ -33,25 +64,22 @@ with conn.cursor() as cur:
 if row:
     print("=== Hand ID:", row["id"])
     print("\n=== Replayer Data (players):")
-    rd = row["replayer_data"]
-    if isinstance(rd, str):
-        rd = json.loads(rd)
-    for p in rd.get("players", []):
+    for p in row["players"] or []:
         print(f"  {p.get('name')}: seat={p.get('seatIndex')}, isHero={p.get('isHero')}, cards={p.get('cards')}, stack={p.get('stack')}")
-    
-    print("\n=== Board:", rd.get("board"))
-    print("=== Pot:", rd.get("pot"))
-    print("=== Dealer Seat:", rd.get("dealerSeat"))
-    
-    # Check raw text for hero cards
-    raw = row["raw_text"] or ""
+
+    print("\n=== Board:", row["board"])
+    print("=== Pot:", row["pot"])
+    print("=== Dealer Seat:", row["dealer_seat"])
+
     print("\n=== Searching raw_text for 'Dealt to Hero'...")
-    import re
-    hero_match = re.search(r"Dealt\s+to\s+Hero\s*\[\s*([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\s*\]", raw, re.IGNORECASE)
+    hero_match = HERO_RE.search(row["hero_line"] or "")
     if hero_match:
         print(f"  Found: [{hero_match.group(1)} {hero_match.group(2)}]")
     else:
-        # Try to find any "Dealt to" line
+        # Only now pull raw_text, for the one hand we're inspecting
+        with conn.cursor() as cur:
+            cur.execute("SELECT raw_text FROM hands WHERE id = %s", (row["id"],))
+            raw = (cur.fetchone() or {}).get("raw_text") or ""
         dealt_lines = [l for l in raw.split("\n") if "Dealt to" in l]
         print(f"  'Dealt to Hero' not found. Found {len(dealt_lines)} 'Dealt to' lines:")
         for l in dealt_lines[:5]:
@@ -8,15 +8,9 @@ import os
 import sys
 import psycopg2
 
-# Load .env file manually
-env_path = os.path.join(os.path.dirname(__file__), '.env')
-if os.path.exists(env_path):
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                k, v = line.split('=', 1)
-                os.environ.setdefault(k.strip(), v.strip())
+# Load .env (shared cached loader)
+from envutil import load_env_file
+load_env_file()
 
 DB_URL = os.getenv("DATABASE_URL")
 if not DB_URL:
@@ -32,22 +26,24 @@ def cleanup_user_data():
     cur = conn.cursor()
     
     try:
-        # 1. Delete study chunks
-        cur.execute("DELETE FROM public.study_chunks WHERE user_id = %s", (USER_ID,))
-        print(f"  Deleted {cur.rowcount} study_chunks")
-        
-        # 2. Delete hands_silver
-        cur.execute("DELETE FROM public.hands_silver WHERE user_id = %s", (USER_ID,))
-        print(f"  Deleted {cur.rowcount} hands_silver rows")
-        
-        # 3. Delete hands
-        cur.execute("DELETE FROM public.hands WHERE user_id = %s", (USER_ID,))
-        print(f"  Deleted {cur.rowcount} hands")
-        
-        # 4. Reset hand_files (delete or set status to 'new')
-        cur.execute("DELETE FROM public.hand_files WHERE user_id = %s", (USER_ID,))
-        print(f"  Deleted {cur.rowcount} hand_files")
-        
+        # One CTE-chained statement deletes study_chunks, hands_silver,
+        # hands, and hand_files in a single round-trip / transaction.
+        cur.execute("""
+            WITH d1 AS (DELETE FROM public.study_chunks WHERE user_id = %s RETURNING 1),
+                 d2 AS (DELETE FROM public.hands_silver WHERE user_id = %s RETURNING 1),
+                 d3 AS (DELETE FROM public.hands WHERE user_id = %s RETURNING 1),
+                 d4 AS (DELETE FROM public.hand_files WHERE user_id = %s RETURNING 1)
+            SELECT (SELECT count(*) FROM d1),
+                   (SELECT count(*) FROM d2),
+                   (SELECT count(*) FROM d3),
+                   (SELECT count(*) FROM d4);
+        """, (USER_ID, USER_ID, USER_ID, USER_ID))
+        n_chunks, n_silver, n_hands, n_files = cur.fetchone()
+        print(f"  Deleted {n_chunks} study_chunks")
+        print(f"  Deleted {n_silver} hands_silver rows")
+        print(f"  Deleted {n_hands} hands")
+        print(f"  Deleted {n_files} hand_files")
+
         conn.commit()
         print("\n✅ Cleanup complete! Ready for re-upload test.")
         
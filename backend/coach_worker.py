@@ -17,15 +17,33 @@ Step 2 (Silver):
 """
 
 import os
+import functools
+import gzip
+import hashlib
+import http.client
+import io
 import logging
 import re
 import json
+import select
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import astuple, dataclass, fields
 from decimal import Decimal, InvalidOperation
 from typing import Optional, Tuple, List, Dict, Any
 from urllib import request, error
+from urllib.parse import urlsplit
 
 import psycopg2
-from psycopg2.extras import RealDictCursor, register_uuid
+from psycopg2.extras import RealDictCursor, register_uuid, execute_values, Json
+
+# This module is imported both as `coach_worker` (from backend/) and as
+# `backend.coach_worker` (from the repo root), so resolve siblings both ways.
+try:
+    import db
+except ImportError:
+    from backend import db
 
 # -----------------------------------------------------------------------------
 # Logging setup
@@ -39,26 +57,14 @@ logger = logging.getLogger(__name__)
 register_uuid()
 
 # -----------------------------------------------------------------------------
-# .env loader (same style as worker.py)
+# .env loader — shared with the other backend scripts via envutil, which
+# caches per path so the in-process orchestrator only parses the file once.
+# Re-exported here because check scripts import it from this module.
 # -----------------------------------------------------------------------------
-def load_env_file(path: Optional[str] = None) -> None:
-    if path is None:
-        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
-    if not os.path.exists(path):
-        logger.info(".env file not found at %s - skipping .env load", path)
-        return
-    logger.info("Loading environment variables from %s", path)
-    try:
-        with open(path, "r") as f:
-            for line in f:
-                line = line.strip()
-                if not line or line.startswith("#") or "=" not in line:
-                    continue
-                k, v = line.split("=", 1)
-                if k and k not in os.environ:
-                    os.environ[k.strip()] = v.strip()
-    except Exception as e:
-        logger.warning("Failed to load .env file %s: %s", path, e)
+try:
+    from envutil import load_env_file
+except ImportError:
+    from backend.envutil import load_env_file
 
 # -----------------------------------------------------------------------------
 # DB connection helpers
@@ -94,7 +100,13 @@ def annotate_raw_text_with_positions(raw_text: str, replayer_data: Dict[str, Any
     """
     if not replayer_data or 'players' not in replayer_data:
         return raw_text
-    
+
+    # Already annotated (idempotent rerun or retry of an enriched hand):
+    # a position tag in the text means a previous pass did the work, so
+    # skip the inference and substitution entirely.
+    if any(f" ({p})" in raw_text for p in ("BTN", "SB", "BB", "CO", "HJ", "UTG")):
+        return raw_text
+
     # Build name -> position mapping
     # Prefer dynamic inference to fix stale replayer data
     position_map = {}
@@ -122,25 +134,93 @@ def annotate_raw_text_with_positions(raw_text: str, replayer_data: Dict[str, Any
     header = parts[0]
     action_section = parts[1] if len(parts) > 1 else ""
     
-    # Annotate each player name in the action section
-    # Sort by length (longest first) to avoid partial matches
-    sorted_names = sorted(position_map.keys(), key=len, reverse=True)
-    
-    annotated_action = action_section
-    for name in sorted_names:
-        position = position_map[name]
-        # Use word boundaries to avoid partial matches
-        # Replace "PlayerName" with "PlayerName (POSITION)"
-        import re
-        pattern = r'\b' + re.escape(name) + r'\b'
-        replacement = f"{name} ({position})"
-        annotated_action = re.sub(pattern, replacement, annotated_action)
-    
+    # Annotate every player name in one pass: a single alternation pattern
+    # with a dict-lookup replacement, instead of one full re.sub scan per
+    # player.
+    pat = _name_annotation_pattern(tuple(sorted(position_map)))
+    annotated_action = pat.sub(
+        lambda m: f"{m.group(0)} ({position_map[m.group(0)]})", action_section
+    )
+
     return header + "*** HOLE CARDS ***" + annotated_action
 
+@functools.lru_cache(maxsize=256)
+def _name_annotation_pattern(names: Tuple[str, ...]) -> "re.Pattern":
+    # Alphabetically-sorted tuple in, so the same table maps to one cache
+    # entry regardless of dict order; alternation is built longest-first
+    # because re tries branches left to right ("Alice2" must beat "Alice").
+    # Anchored to line starts: action lines are "Name: does X", and an
+    # unanchored \b match also annotated names quoted mid-sentence (chat
+    # lines, "Uncalled bet returned to ..."), confusing the coach.
+    ordered = sorted(names, key=len, reverse=True)
+    return re.compile(r"(?m)^(?:" + "|".join(re.escape(n) for n in ordered) + r")\b")
+
 # -----------------------------------------------------------------------------
 # Coach API call
 # -----------------------------------------------------------------------------
+class _RateLimiter:
+    """
+    Token-bucket style limiter shared by the coach worker threads: calls
+    proceed immediately while under COACH_RPS and only block once the
+    steady-state rate is exceeded. rps <= 0 disables throttling.
+    """
+    def __init__(self, rps: float):
+        self.interval = 1.0 / rps if rps > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_allowed = time.monotonic()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+# One persistent connection per worker thread. urllib opens a fresh socket per
+# call, so every hand pays the TCP+TLS handshake (~2 RTT); keep-alive drops
+# that to once per thread, which dominates latency for these small POSTs.
+_CONN_LOCAL = threading.local()
+
+def _coach_connection(parts) -> http.client.HTTPConnection:
+    key = (parts.scheme, parts.hostname, parts.port)
+    conn = getattr(_CONN_LOCAL, "conn", None)
+    if conn is None or getattr(_CONN_LOCAL, "key", None) != key:
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        conn = cls(parts.hostname, parts.port, timeout=180)
+        _CONN_LOCAL.conn = conn
+        _CONN_LOCAL.key = key
+    return conn
+
+def _drop_coach_connection() -> None:
+    conn = getattr(_CONN_LOCAL, "conn", None)
+    _CONN_LOCAL.conn = None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+_RATE_LIMITER: Optional[_RateLimiter] = None
+
+def _coach_rate_limiter() -> _RateLimiter:
+    # Lazy so COACH_RPS from .env (loaded in run_once) is respected.
+    global _RATE_LIMITER
+    if _RATE_LIMITER is None:
+        try:
+            rps = float(os.getenv("COACH_RPS", "0"))
+        except ValueError:
+            rps = 0.0
+        _RATE_LIMITER = _RateLimiter(rps)
+    return _RATE_LIMITER
+
 def call_coach_api(
     hand_id: Any,
     raw_text: str,
@@ -161,18 +241,43 @@ def call_coach_api(
     if replayer_data:
         payload["replayer_data"] = replayer_data
     
-    # DEBUG: Log the payload
-    # logging.info(f"DEBUG_PAYLOAD: position={payload.get('parsed', {}).get('position')} payload_pos={payload.get('position')}")
-    print(f"DEBUG_PAYLOAD: position={payload.get('parsed', {}).get('position')} payload_pos={payload.get('position')}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("payload: position=%s payload_pos=%s",
+                     payload.get("parsed", {}).get("position"), payload.get("position"))
 
     data_bytes = json.dumps(payload).encode("utf-8")
     headers = { "Content-Type": "application/json", "x-app-token": token }
-    req = request.Request(url, data=data_bytes, headers=headers, method="POST")
+    # Hand histories are highly repetitive text; gzip typically shrinks the
+    # payload 5-10x. Opt-in so older deployments of the API keep working.
+    if os.getenv("COACH_GZIP", "false").lower() == "true":
+        data_bytes = gzip.compress(data_bytes)
+        headers["Content-Encoding"] = "gzip"
+    _coach_rate_limiter().wait()
 
     try:
-        with request.urlopen(req, timeout=180) as resp:
-            body = resp.read()
-        resp_json = json.loads(body.decode("utf-8"))
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        status = reason = resp_headers = body = None
+        for attempt in (1, 2):
+            conn = _coach_connection(parts)
+            try:
+                conn.request("POST", path, body=data_bytes, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                status, reason, resp_headers = resp.status, resp.reason, resp.headers
+                break
+            except (http.client.HTTPException, ConnectionError, OSError):
+                # The server may have closed an idle keep-alive socket between
+                # batches; reconnect once before giving up on this hand.
+                _drop_coach_connection()
+                if attempt == 2:
+                    raise
+        if status >= 400:
+            raise error.HTTPError(url, status, reason, resp_headers, io.BytesIO(body))
+        # json.loads accepts bytes directly; skip the intermediate decoded str
+        resp_json = json.loads(body)
 
         # Return full response dict instead of unpacking
         # This allows accessing hero_position and other fields
@@ -215,19 +320,64 @@ def call_coach_api(
         logger.error("Coach API unexpected error for hand %s: %s", hand_id, e)
     return None
 
-def fetch_hands_for_coaching(conn, limit: int) -> List[Dict[str, Any]]:
-    sql = """
-        SELECT id, user_id, raw_text, position, cards, board, stakes, replayer_data
+# Claim pattern (same as worker.py's CLAIM_SQL): mark the batch IN_PROGRESS so
+# concurrent workers skip each other's rows instead of double-coaching them.
+CLAIM_HANDS_SQL = """
+    WITH c AS (
+        SELECT id
         FROM public.hands
         WHERE gto_strategy IS NULL
-          AND raw_text IS NOT NULL
+          AND raw_text IS NOT NULL{user_filter}
         ORDER BY COALESCE(date, created_at::date), id
-        LIMIT %s;
-    """
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE public.hands h
+       SET gto_strategy = 'IN_PROGRESS'
+      FROM c
+     WHERE h.id = c.id
+    RETURNING h.id, h.user_id, h.raw_text, h.position, h.cards, h.board, h.stakes,
+        -- Project only the replayer_data keys that are actually consumed:
+        -- players/actions/board by the agent pipeline, the rest by
+        -- extract_parsed_data and annotate_raw_text_with_positions. Large
+        -- unused keys never cross the wire. strip_nulls restores
+        -- missing-key semantics for absent fields; NULL stays NULL so the
+        -- API's build-minimal-replayer fallback still triggers.
+        CASE WHEN h.replayer_data IS NULL THEN NULL
+             ELSE jsonb_strip_nulls(jsonb_build_object(
+                'players',       h.replayer_data->'players',
+                'actions',       h.replayer_data->'actions',
+                'board',         h.replayer_data->'board',
+                'sb',            h.replayer_data->'sb',
+                'bb',            h.replayer_data->'bb',
+                'pot',           h.replayer_data->'pot',
+                'hero',          h.replayer_data->'hero',
+                'hero_position', h.replayer_data->'hero_position',
+                'hero_cards',    h.replayer_data->'hero_cards'))
+        END AS replayer_data;
+"""
+
+def fetch_hands_for_coaching(conn, limit: int, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    if user_id is None:
+        sql = CLAIM_HANDS_SQL.format(user_filter="")
+        params: Tuple = (limit,)
+    else:
+        sql = CLAIM_HANDS_SQL.format(user_filter="\n          AND user_id = %s")
+        params = (user_id, limit)
     with conn.cursor() as cur:
-        cur.execute(sql, (limit,))
+        cur.execute(sql, params)
         return cur.fetchall()
 
+def release_claimed_hands(conn, hand_ids: List[Any]) -> None:
+    """Return un-coached claims to the pending queue (gto_strategy NULL)."""
+    if not hand_ids:
+        return
+    with conn.cursor() as cur:
+        cur.execute(
+            "UPDATE public.hands SET gto_strategy = NULL WHERE id = ANY(%s) AND gto_strategy = 'IN_PROGRESS';",
+            (hand_ids,),
+        )
+
 def extract_parsed_data(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Extract structured data from the row to pass to the coach API.
@@ -280,7 +430,7 @@ def extract_parsed_data(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     try:
         inferred_map = infer_positions_from_text(row.get("raw_text") or "")
         # Look for Hero by name
-        hero_name_match = re.search(r"^Dealt\s+to\s+(\S+)", row.get("raw_text") or "", re.MULTILINE)
+        hero_name_match = DEALT_TO_RE.search(row.get("raw_text") or "")
         if hero_name_match:
             hname = hero_name_match.group(1).strip()
             if hname in inferred_map:
@@ -336,60 +486,177 @@ def update_hand_with_coach(
         WHERE id = %s;
     """
     with conn.cursor() as cur:
-        # Use Json wrapper for JSONB column
-        from psycopg2.extras import Json
         cur.execute(sql, (
-            gto_strategy, 
-            exploit_deviation, 
-            learning_tag, 
-            Json(exploit_signals) if exploit_signals else None, 
-            position, 
+            gto_strategy,
+            exploit_deviation,
+            learning_tag,
+            Json(exploit_signals) if exploit_signals else None,
+            position,
             Json(hero_classification) if hero_classification else None,
             Json(spr_analysis) if spr_analysis else None,
             Json(mistake_analysis) if mistake_analysis else None,
             hand_id
         ))
 
-def coach_new_hands(conn, batch_size: int) -> int:
-    rows = fetch_hands_for_coaching(conn, batch_size)
+def update_hands_with_coach_batch(conn, results: List[Tuple]) -> None:
+    """
+    Flush one batch of coach results with a single UPDATE ... FROM (VALUES ...).
+
+    Each result tuple is (hand_id, gto_strategy, exploit_deviation, learning_tag,
+    exploit_signals, position, hero_classification, spr_analysis, mistake_analysis)
+    with JSONB values already wrapped in psycopg2 Json. One statement per batch
+    instead of one UPDATE round-trip per hand.
+    """
+    if not results:
+        return
+    sql = """
+        UPDATE public.hands AS h
+        SET gto_strategy = v.gto_strategy,
+            exploit_deviation = v.exploit_deviation,
+            learning_tag = v.learning_tag,
+            exploit_signals = v.exploit_signals,
+            position = COALESCE(v.position, h.position),
+            hero_classification = v.hero_classification,
+            spr_analysis = v.spr_analysis,
+            mistake_analysis = v.mistake_analysis
+        FROM (VALUES %s) AS v(
+            id, gto_strategy, exploit_deviation, learning_tag,
+            exploit_signals, position, hero_classification, spr_analysis, mistake_analysis
+        )
+        WHERE h.id = v.id;
+    """
+    template = "(%s::uuid, %s::text, %s::text, %s::text[], %s::jsonb, %s::text, %s::jsonb, %s::jsonb, %s::jsonb)"
+    with conn.cursor() as cur:
+        execute_values(cur, sql, results, template=template, page_size=100)
+
+def result_from_response(hand_id: Any, response: Dict[str, Any]) -> Optional[Tuple]:
+    """Convert a coach API response into the tuple update_hands_with_coach_batch expects."""
+    gto = response.get('gto_strategy')
+    dev = response.get('exploit_deviation')
+    lt = response.get('learning_tag')
+    exploit_signals = response.get('exploit_signals')  # NEW: Agent 7 data
+    hero_pos = response.get('hero_position')
+
+    if gto is None and dev is None and not lt:
+        return None
+
+    hero_cls = response.get('hero_classification')
+    spr_ana = response.get('spr_analysis')
+    mistake_ana = response.get('mistake_analysis')
+
+    return (
+        hand_id,
+        gto,
+        dev,
+        lt,
+        Json(exploit_signals) if exploit_signals else None,
+        hero_pos,
+        Json(hero_cls) if hero_cls else None,
+        Json(spr_ana) if spr_ana else None,
+        Json(mistake_ana) if mistake_ana else None,
+    )
+
+def coach_one(row: Dict[str, Any]) -> Tuple[Optional[Tuple], Optional[Dict[str, Any]]]:
+    """
+    Coach a single hand: annotate, call the coach API, and return
+    (result tuple, raw response) — both None on failure / empty response.
+    No DB access, so it is safe to run from worker threads.
+    """
+    hand_id = row["id"]
+    raw_text = row["raw_text"]
+    replayer_data = row.get("replayer_data") or {}
+
+    # Annotate raw text with player positions to prevent LLM hallucinations
+    annotated_raw_text = annotate_raw_text_with_positions(raw_text, replayer_data)
+
+    # Extract pre-parsed data for more accurate coaching
+    parsed_data = extract_parsed_data(row)
+    if parsed_data:
+        logger.debug("Passing parsed data to coach: position=%s, cards=%s, pot_type=%s",
+                    parsed_data.get("position"), parsed_data.get("cards"), parsed_data.get("pot_type"))
+
+    # Send annotated raw text (with positions) instead of original
+    response = call_coach_api(hand_id, annotated_raw_text, parsed_data, replayer_data)
+    if response is None:
+        return None, None
+
+    return result_from_response(hand_id, response), response
+
+# -----------------------------------------------------------------------------
+# Coach response cache (content-addressed, see coach_cache migration)
+# -----------------------------------------------------------------------------
+def coach_cache_key(row: Dict[str, Any]) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    h.update((row.get("raw_text") or "").encode("utf-8"))
+    for field in ("stakes", "position", "cards", "board"):
+        h.update(b"\x00")
+        h.update(str(row.get(field) or "").encode("utf-8"))
+    return h.digest()
+
+def fetch_coach_cache(conn, keys: List[bytes]) -> Dict[bytes, Dict[str, Any]]:
+    if not keys:
+        return {}
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT hash, response FROM public.coach_cache WHERE hash = ANY(%s);", (keys,))
+            return {bytes(r["hash"]): r["response"] for r in cur.fetchall()}
+    except psycopg2.Error as e:
+        logger.warning("coach_cache lookup failed (table missing?): %s", e)
+        return {}
+
+def store_coach_cache(conn, entries: List[Tuple[bytes, Dict[str, Any]]]) -> None:
+    if not entries:
+        return
+    try:
+        with conn.cursor() as cur:
+            execute_values(
+                cur,
+                "INSERT INTO public.coach_cache (hash, response) VALUES %s ON CONFLICT (hash) DO NOTHING;",
+                [(psycopg2.Binary(k), Json(resp)) for k, resp in entries],
+            )
+    except psycopg2.Error as e:
+        logger.warning("coach_cache insert failed: %s", e)
+
+def coach_new_hands(conn, batch_size: int, user_id: Optional[str] = None) -> int:
+    rows = fetch_hands_for_coaching(conn, batch_size, user_id=user_id)
     if not rows:
         logger.info("No hands needing coaching.")
         return 0
-    coached = 0
-    for row in rows:
-        hand_id = row["id"]
-        raw_text = row["raw_text"]
-        replayer_data = row.get("replayer_data") or {}
-        
-        # Annotate raw text with player positions to prevent LLM hallucinations
-        annotated_raw_text = annotate_raw_text_with_positions(raw_text, replayer_data)
-        
-        # Extract pre-parsed data for more accurate coaching
-        parsed_data = extract_parsed_data(row)
-        if parsed_data:
-            logger.debug("Passing parsed data to coach: position=%s, cards=%s, pot_type=%s",
-                        parsed_data.get("position"), parsed_data.get("cards"), parsed_data.get("pot_type"))
-        
-        # Send annotated raw text (with positions) instead of original
-        response = call_coach_api(hand_id, annotated_raw_text, parsed_data, replayer_data)
-        if response is None:
-            continue
-        
-        gto = response.get('gto_strategy')
-        dev = response.get('exploit_deviation')
-        lt = response.get('learning_tag')
-        exploit_signals = response.get('exploit_signals')  # NEW: Agent 7 data
-        hero_pos = response.get('hero_position')
-        
-        if gto is None and dev is None and not lt:
-            continue
-
-        hero_cls = response.get('hero_classification')
-        spr_ana = response.get('spr_analysis')
-        mistake_ana = response.get('mistake_analysis')
-
-        update_hand_with_coach(conn, hand_id, gto, dev, lt, exploit_signals, hero_pos, hero_cls, spr_ana, mistake_ana)
-        coached += 1
+    # Serve duplicate hands straight from coach_cache; only misses go out
+    # over HTTP. Coach calls are I/O-bound (long timeouts), so fan the
+    # misses out over a thread pool and flush everything in one batched UPDATE.
+    cache_keys = {row["id"]: coach_cache_key(row) for row in rows}
+    cached = fetch_coach_cache(conn, list(cache_keys.values()))
+    results: List[Tuple] = []
+    try:
+        to_coach: List[Dict[str, Any]] = []
+        for row in rows:
+            response = cached.get(cache_keys[row["id"]])
+            if response is not None:
+                result = result_from_response(row["id"], response)
+                if result is not None:
+                    results.append(result)
+            else:
+                to_coach.append(row)
+        if cached:
+            logger.info("Served %d of %d hands from coach_cache.", len(rows) - len(to_coach), len(rows))
+
+        if to_coach:
+            max_workers = min(len(to_coach), int(os.getenv("COACH_MAX_WORKERS", "8")))
+            new_entries: List[Tuple[bytes, Dict[str, Any]]] = []
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                for row, (result, response) in zip(to_coach, pool.map(coach_one, to_coach)):
+                    if result is not None:
+                        results.append(result)
+                        new_entries.append((cache_keys[row["id"]], response))
+            store_coach_cache(conn, new_entries)
+
+        update_hands_with_coach_batch(conn, results)
+    finally:
+        # Any claim that didn't get a coach result goes back to the queue.
+        coached_ids = {r[0] for r in results}
+        release_claimed_hands(conn, [row["id"] for row in rows if row["id"] not in coached_ids])
+    coached = len(results)
     logger.info("Coached %d hands this run.", coached)
     return coached
 
@@ -402,6 +669,7 @@ STAKES_LOOSE  = re.compile(r"\$?\s*(\d+(?:\.\d+)?)\s*/\s*\$?\s*(\d+(?:\.\d+)?)")
 
 # Cards / board (from raw text)
 HERO_CARDS = re.compile(r"Dealt to\s+\S+\s*\[([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\]", re.IGNORECASE)
+DEALT_TO_RE = re.compile(r"^Dealt\s+to\s+(\S+)", re.MULTILINE)
 FLOP_RE    = re.compile(r"\*\*\*\s*FLOP\s*\*\*\*\s*\[([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\s+([2-9TJQKA][cdhs])\]", re.IGNORECASE)
 TURN_RE    = re.compile(r"\*\*\*\s*TURN\s*\*\*\*.*?\[([2-9TJQKA][cdhs])\]", re.IGNORECASE)
 RIVER_RE   = re.compile(r"\*\*\*\s*RIVER\s*\*\*\*.*?\[([2-9TJQKA][cdhs])\]", re.IGNORECASE)
@@ -427,23 +695,57 @@ THREEB_RE = re.compile(r"(?i)\b(3[- ]?bet|re[- ]?raise)\b")
 FOURB_RE  = re.compile(r"(?i)\b(4[- ]?bet)\b")
 ALLIN_RE  = re.compile(r"(?i)\b(all[- ]?in|shove|jam)\b")
 CALL_PREFLOP = re.compile(r"(?is)\*\*\*\s*HOLE CARDS\s*\*\*\*.*?Hero:\s*calls\b")
+HERO_CALLS_RE = re.compile(r"^Hero:\s*calls\b", re.IGNORECASE | re.MULTILINE)
+
+# Fused scan for the boolean street/action flags above: one alternation with
+# named groups walks the hand once instead of seven separate full-text passes.
+# The individual patterns are kept for callers that test a flag in isolation.
+_FLAG_SCAN_RE = re.compile(
+    r"(?i)"
+    r"(?P<river>\*\*\*\s*river\s*\*\*\*)"
+    r"|(?P<showdown>\bshow\s*down|showdown\b)"
+    r"|(?P<turn>\*\*\*\s*turn\s*\*\*\*)"
+    r"|(?P<flop>\*\*\*\s*flop\s*\*\*\*)"
+    r"|(?P<open>\b(?:hero|you)\s*:\s*(?:raises|opens)\b)"
+    r"|(?P<threeb>\b(?:3[- ]?bet|re[- ]?raise)\b)"
+    r"|(?P<fourb>\b4[- ]?bet\b)"
+    r"|(?P<allin>\b(?:all[- ]?in|shove|jam)\b)"
+)
+_FLAG_COUNT = 8
+
+@functools.lru_cache(maxsize=128)
+def _scan_flags(text: str) -> frozenset:
+    """Names of the _FLAG_SCAN_RE groups that occur anywhere in text."""
+    found = set()
+    for m in _FLAG_SCAN_RE.finditer(text):
+        found.add(m.lastgroup)
+        if len(found) == _FLAG_COUNT:
+            break
+    return frozenset(found)
 
 # Currency / win lines
 CURRENCY_RE   = re.compile(r"([$€£])")
 HERO_WIN_RE   = re.compile(r"(?i)\b(hero|you).{0,40}\b(collected|wins)\b.*?(?:\$|€|£)?\s*([0-9]+(?:\.[0-9]+)?)")
 OTHER_WIN_RE  = re.compile(r"(?i)\b(collected|wins)\b.*?(?:\$|€|£)?\s*([0-9]+(?:\.[0-9]+)?)")
 
-# Bet parsing (hero invested) – simple but effective for ACR-like lines
+# Bet parsing (hero invested) – simple but effective for ACR-like lines.
+# Single capture group: the verb alternation is non-capturing so callers
+# read the amount from group(1) without probing four slots per match.
 HERO_INVEST_RE = re.compile(
-    r"(?im)^Hero:\s*(?:posts (?:small blind|big blind)\s*(?:\$|€|£)?([0-9]+(?:\.[0-9]+)?)"
-    r"|bets\s*(?:\$|€|£)?([0-9]+(?:\.[0-9]+)?)"
-    r"|calls\s*(?:\$|€|£)?([0-9]+(?:\.[0-9]+)?)"
-    r"|raises to\s*(?:\$|€|£)?([0-9]+(?:\.[0-9]+)?))"
+    r"(?im)^Hero:\s*(?:posts (?:small blind|big blind)|bets|calls|raises to)"
+    r"\s*(?:\$|€|£)?([0-9]+(?:\.[0-9]+)?)"
 )
 
 # Position inference from button + seats (2–9 players)
 SEAT_LINE   = re.compile(r"^Seat\s+(\d+):\s+(.+?)\s+\(", re.IGNORECASE | re.MULTILINE)
 BUTTON_LINE = re.compile(r"Seat\s*#\s*(\d+)\s+is\s+the\s+button", re.IGNORECASE)
+_INACTIVE_PATTERNS = [
+    re.compile(r'(\w+)\s+sits?\s+out', re.IGNORECASE),
+    re.compile(r'(\w+)\s+waits\s+for\s+big\s+blind', re.IGNORECASE),
+    re.compile(r'(\w+)\s+will\s+be\s+allowed\s+to\s+play', re.IGNORECASE),
+]
+# Relaxed: handle optional colon AND optional 'the'
+_SB_POST_RE = re.compile(r"^(\S+?)(?:\s*:\s*|\s+)posts\s+(?:the\s+)?small\s+blind", re.IGNORECASE | re.MULTILINE)
 
 PREFLOP_ORDER_MAP: Dict[int, List[str]] = {
     2:  ["SB/BTN", "BB"],
@@ -456,22 +758,40 @@ PREFLOP_ORDER_MAP: Dict[int, List[str]] = {
     9:  ["UTG", "UTG+1", "UTG+2", "LJ", "HJ", "CO", "BTN", "SB", "BB"],
 }
 
-def labels_around_button(num_players: int) -> List[str]:
-    order = PREFLOP_ORDER_MAP.get(num_players) or PREFLOP_ORDER_MAP[6]
+def _rotate_to_button(order: List[str]) -> List[str]:
     i_btn = order.index("BTN") if "BTN" in order else 0
-    tail = order[i_btn:]   # BTN, SB, BB, ...
-    head = order[:i_btn]
-    return tail + head     # around the table starting at BTN
+    return order[i_btn:] + order[:i_btn]   # around the table starting at BTN
+
+# Only 8 distinct table sizes exist, so rotate each label list once at import.
+_LABELS_BY_N: Dict[int, List[str]] = {
+    n: _rotate_to_button(order) for n, order in PREFLOP_ORDER_MAP.items()
+}
+
+def labels_around_button(num_players: int) -> List[str]:
+    return _LABELS_BY_N.get(num_players) or _LABELS_BY_N[6]
 
 def infer_positions_from_text(text: str) -> Dict[str, str]:
+    # The same raw text is scanned from annotate_raw_text_with_positions,
+    # extract_parsed_data and build_silver_payload within one run; cache by
+    # text. Return a copy so callers can extend the mapping freely.
+    return dict(_infer_positions_cached(text))
+
+@functools.lru_cache(maxsize=1024)
+def _infer_positions_cached(text: str) -> Dict[str, str]:
     if not text:
         return {}
-        
+
     # CRITICAL: Srip Summary section to avoid duplicate seat matches
     if "*** SUMMARY ***" in text:
         text = text.split("*** SUMMARY ***")[0]
-        
-    m_btn = BUTTON_LINE.search(text)
+
+    # Seat lines, the button line and the blind posts all live in the header
+    # before the hole cards; scanning just that slice cuts the multiline
+    # regex work by the header-to-hand ratio. Inactive-player notices can
+    # appear mid-hand, so those still scan the whole (summary-free) text.
+    header = text.split("*** HOLE CARDS ***", 1)[0]
+
+    m_btn = BUTTON_LINE.search(header)
     if not m_btn:
         return {}
     try:
@@ -483,36 +803,29 @@ def infer_positions_from_text(text: str) -> Dict[str, str]:
 
     # Check for inactive players (sitting out, waits for BB, etc.)
     inactive_players = set()
-    inactive_patterns = [
-        re.compile(r'(\w+)\s+sits?\s+out', re.IGNORECASE),
-        re.compile(r'(\w+)\s+waits\s+for\s+big\s+blind', re.IGNORECASE),
-        re.compile(r'(\w+)\s+will\s+be\s+allowed\s+to\s+play', re.IGNORECASE)
-    ]
-    for pattern in inactive_patterns:
+    for pattern in _INACTIVE_PATTERNS:
         for m_status in pattern.finditer(text):
             found_name = m_status.group(1).strip()
-            # logging.info(f"DEBUG: Found inactive player: {found_name}")
-            print(f"DEBUG: Found inactive player: {found_name}")
+            logger.debug("Found inactive player: %s", found_name)
             inactive_players.add(found_name)
 
-    for m in SEAT_LINE.finditer(text):
+    for m in SEAT_LINE.finditer(header):
         try:
             seat_num = int(m.group(1))
             name = m.group(2).strip()
-            
+
             # Skip if inactive
             if name in inactive_players:
-                # logging.info(f"DEBUG: Skipping inactive seat {seat_num}: {name}")
-                print(f"DEBUG: Skipping inactive seat {seat_num}: {name}")
+                logger.debug("Skipping inactive seat %s: %s", seat_num, name)
                 continue
 
             # Also check the seat line itself for "sitting out"
             line_start = m.start()
-            line_end = text.find('\n', line_start)
-            if line_end == -1: line_end = len(text)
-            seat_line = text[line_start:line_end]
+            line_end = header.find('\n', line_start)
+            if line_end == -1: line_end = len(header)
+            seat_line = header[line_start:line_end]
             if 'sitting out' in seat_line.lower():
-                print(f"DEBUG: Skipping sitting out line seat {seat_num}: {name}")
+                logger.debug("Skipping sitting out line seat %s: %s", seat_num, name)
                 continue
 
             if name:
@@ -520,7 +833,8 @@ def infer_positions_from_text(text: str) -> Dict[str, str]:
         except:
             continue
     
-    print(f"DEBUG: Final Occupied Seats: {sorted(seats)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Final occupied seats: %s", sorted(seats))
     if not seats:
         return {}
 
@@ -537,9 +851,7 @@ def infer_positions_from_text(text: str) -> Dict[str, str]:
         # Fallback: Dead Button Scenario
         # Find player who posted SB
         sb_name = None
-        # Relaxed regex: handle optional colon AND optional 'the'
-        sb_regex = re.compile(r"^(\S+?)(?:\s*:\s*|\s+)posts\s+(?:the\s+)?small\s+blind", re.IGNORECASE | re.MULTILINE)
-        m_sb = sb_regex.search(text)
+        m_sb = _SB_POST_RE.search(header)
         if m_sb:
             sb_name = m_sb.group(1).strip()
             
@@ -586,10 +898,12 @@ def extract_stakes_from_raw_text(raw_text: Optional[str]) -> Tuple[Optional[str]
         return None, None, None
     return f"{sb_str}/{bb_str}", sb, bb
 
+_NUM_RE = re.compile(r"\d+(?:\.\d+)?")
+
 def parse_stakes_from_string(stakes_raw: Optional[str]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
     if not stakes_raw:
         return None, None
-    nums = re.findall(r"(\d+(?:\.\d+)?)", stakes_raw.strip())
+    nums = _NUM_RE.findall(stakes_raw.strip())
     if len(nums) < 2:
         return None, None
     try:
@@ -613,30 +927,54 @@ def normalize_position(pos_raw: Optional[str]) -> Optional[str]:
         if raw_key in p: return norm
     return None
 
+def _marker_offset(text: str, marker: str) -> int:
+    """Literal C-level find for a street marker; -1 when absent/non-standard."""
+    return text.find(marker)
+
 def extract_cards_and_board(text: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
-    """Return (cards, flop, turn, river) from raw HH."""
+    """Return (cards, flop, turn, river) from raw HH.
+
+    Street markers are located once with literal finds and used as start
+    offsets for the per-street patterns, so each regex scans from its own
+    marker instead of the top of the hand. A missing literal (non-standard
+    marker spacing) falls back to the tolerant full-text search.
+    """
     if not text:
         return None, None, None, None
     cards = None
-    m = HERO_CARDS.search(text)
+    i_hc = _marker_offset(text, "*** HOLE CARDS ***")
+    m = HERO_CARDS.search(text, i_hc if i_hc >= 0 else 0)
     if m:
         c1, c2 = m.group(1).upper(), m.group(2).upper()
         cards = f"{c1} {c2}"
 
     flop = turn = river = None
-    mf = FLOP_RE.search(text)
+    i_f = _marker_offset(text, "*** FLOP ***")
+    mf = FLOP_RE.search(text, i_f) if i_f >= 0 else FLOP_RE.search(text)
     if mf:
         flop = " ".join([mf.group(1).upper(), mf.group(2).upper(), mf.group(3).upper()])
-    mt = TURN_RE.search(text)
+    i_t = _marker_offset(text, "*** TURN ***")
+    mt = TURN_RE.search(text, i_t) if i_t >= 0 else TURN_RE.search(text)
     if mt:
         turn = mt.group(1).upper()
-    mr = RIVER_RE.search(text)
+    i_r = _marker_offset(text, "*** RIVER ***")
+    mr = RIVER_RE.search(text, i_r) if i_r >= 0 else RIVER_RE.search(text)
     if mr:
         river = mr.group(1).upper()
     return cards, flop, turn, river
 
 def detect_site(text: Optional[str]) -> Optional[str]:
     if not text: return None
+    # Literal membership on a lowered buffer first — C-level substring
+    # search beats the case-insensitive alternation for the common sites.
+    # The regex stays as the fallback for the word-bounded "acr" token.
+    s = text.lower()
+    if "americas cardroom" in s or "americascardroom" in s:
+        return "ACR"
+    for token, site in (("pokerstars", "Pokerstars"), ("ggpoker", "Ggpoker"),
+                        ("clubgg", "Clubgg"), ("pokerbros", "Pokerbros")):
+        if token in s:
+            return site
     m = SITE_RE.search(text)
     if not m: return None
     val = m.group(1).lower()
@@ -658,18 +996,29 @@ def detect_table_size(text: Optional[str]) -> Optional[int]:
     except: return None
 
 def detect_street_reached(text: Optional[str]) -> str:
-    s = text or ""
-    if RIVER_TAG.search(s) or SHOWDOWN_RE.search(s): return "river"
-    if TURN_TAG.search(s): return "turn"
-    if FLOP_TAG.search(s): return "flop"
+    flags = _scan_flags(text or "")
+    if "river" in flags or "showdown" in flags: return "river"
+    if "turn" in flags: return "turn"
+    if "flop" in flags: return "flop"
     return "preflop"
 
 def detect_actions(text: Optional[str]) -> Tuple[bool,bool,bool,bool]:
-    s = text or ""
-    return bool(OPEN_RE.search(s)), bool(THREEB_RE.search(s)), bool(FOURB_RE.search(s)), bool(ALLIN_RE.search(s))
+    flags = _scan_flags(text or "")
+    return "open" in flags, "threeb" in flags, "fourb" in flags, "allin" in flags
 
 def detect_preflop_call(text: Optional[str]) -> bool:
-    return bool(CALL_PREFLOP.search(text or ""))
+    # Bounded search: locate the preflop segment with two literal finds and
+    # run the anchored Hero-calls pattern on that slice only, instead of
+    # letting CALL_PREFLOP's DOTALL ``.*?`` crawl from the hole-cards marker
+    # to wherever the first call happens to be.
+    s = text or ""
+    idx = s.find("*** HOLE CARDS ***")
+    if idx == -1:
+        # Non-standard marker spacing — fall back to the tolerant regex.
+        return bool(CALL_PREFLOP.search(s))
+    end = s.find("*** FLOP ***", idx)
+    segment = s[idx:end] if end > 0 else s[idx:]
+    return HERO_CALLS_RE.search(segment) is not None
 
 def detect_currency(text: Optional[str]) -> Optional[str]:
     if not text: return None
@@ -698,17 +1047,18 @@ def detect_result(text: Optional[str], bb: Optional[Decimal]) -> Tuple[Optional[
     m_other = OTHER_WIN_RE.search(text)
     if m_other:
         cur = detect_currency(text)
-        total = Decimal(0)
-        for mv in HERO_INVEST_RE.finditer(text):
-            for gi in range(1, 5):
-                val = mv.group(gi)
-                if val:
-                    try:
-                        total += Decimal(val)
-                    except:
-                        pass
-        if total > 0:
-            amt = -total
+        # Accumulate as integer cents; one Decimal conversion at the end
+        # instead of a Decimal add per matched action line. Locate the
+        # first match with the (case-insensitive) regex itself, then
+        # iterate from there so the header is only scanned once.
+        total_cents = 0
+        first = HERO_INVEST_RE.search(text)
+        if first:
+            total_cents += int(round(float(first.group(1)) * 100))
+            for mv in HERO_INVEST_RE.finditer(text, first.end()):
+                total_cents += int(round(float(mv.group(1)) * 100))
+        if total_cents > 0:
+            amt = -(Decimal(total_cents) / 100)
             return cur, amt, (amt / bb) if (bb and bb > 0) else None
 
     return None, None, None
@@ -723,25 +1073,35 @@ _TAG_MAP = {
     "trip hands management": "trips_management",
     "trips_management": "trips_management",
 }
+_TAG_CLEAN_RE = re.compile(r"[^a-z0-9_]+")
+
 def normalize_tags(tags: Optional[List[str]]) -> List[str]:
     out = []
     for t in (tags or []):
         raw = t.strip().lower()
-        key = re.sub(r"[^a-z0-9_]+", "_", raw).strip("_")
+        key = _TAG_CLEAN_RE.sub("_", raw).strip("_")
         norm = _TAG_MAP.get(raw, _TAG_MAP.get(key, key))
         if norm:
             out.append(norm)
-    # de-dup, preserve order
-    seen, uniq = set(), []
-    for t in out:
-        if t not in seen:
-            seen.add(t); uniq.append(t)
-    return uniq
+    # de-dup, preserve order (dicts keep insertion order)
+    return list(dict.fromkeys(out))
 
 # -----------------------------------------------------------------------------
 # Silver upsert
 # -----------------------------------------------------------------------------
-def fetch_unprocessed_hands(conn, limit: int) -> List[Dict[str, Any]]:
+def fetch_unprocessed_hands(conn, limit: int):
+    """
+    Stream coached hands that have no silver row yet. Server-side (named)
+    cursor, so backfill-sized limits arrive in itersize pages instead of
+    one client-side fetchall; withhold is needed because the worker
+    connection runs in autocommit.
+
+    NOT EXISTS lets the planner run an anti-join probing the hands_silver
+    primary key per candidate hand, instead of materializing the full
+    LEFT JOIN before filtering. No persisted cursor is needed: each cycle
+    upserts the rows it reads, which removes them from this predicate, so
+    the scan is already bounded by the not-yet-processed hands.
+    """
     sql = """
         SELECT
             h.id AS hand_id,
@@ -758,87 +1118,60 @@ def fetch_unprocessed_hands(conn, limit: int) -> List[Dict[str, Any]]:
             h.learning_tag AS learning_tag,
             now() AS parsed_at
         FROM public.hands h
-        LEFT JOIN public.hands_silver s
-          ON s.hand_id = h.id
-        WHERE s.hand_id IS NULL
+        WHERE NOT EXISTS (
+                SELECT 1 FROM public.hands_silver s
+                WHERE s.hand_id = h.id
+              )
           AND h.gto_strategy IS NOT NULL
+          AND h.gto_strategy <> 'IN_PROGRESS'
         ORDER BY hand_date NULLS LAST, h.id
         LIMIT %s;
     """
-    with conn.cursor() as cur:
+    with conn.cursor(name="silver_fetch", withhold=True) as cur:
+        cur.itersize = 500
         cur.execute(sql, (limit,))
-        return cur.fetchall()
-
-def upsert_silver_rows(conn, rows: List[Dict[str, Any]]) -> int:
-    if not rows:
-        return 0
-    insert_sql = """
-        INSERT INTO public.hands_silver (
-            hand_id,
-            user_id,
-            hand_date,
-            stakes_raw,
-            small_blind,
-            big_blind,
-            position_raw,
-            position_norm,
-            cards,
-            flop_cards,
-            turn_card,
-            river_card,
-            board,
-            hand_class,
-            gto_strategy,
-            exploit_deviation,
-            learning_tag,
-            hero_position,       -- NEW
-            preflop_call,        -- NEW
-            site,
-            game_type,
-            table_size,
-            street_reached,
-            result_amount,
-            result_bb,
-            preflop_open,
-            preflop_3bet,
-            preflop_4bet,
-            all_in,
-            currency,
-            parsed_at
-        )
-        VALUES (
-            %(hand_id)s,
-            %(user_id)s,
-            %(hand_date)s,
-            %(stakes_raw)s,
-            %(small_blind)s,
-            %(big_blind)s,
-            %(position_raw)s,
-            %(position_norm)s,
-            %(cards)s,
-            %(flop_cards)s,
-            %(turn_card)s,
-            %(river_card)s,
-            %(board)s,
-            %(hand_class)s,
-            %(gto_strategy)s,
-            %(exploit_deviation)s,
-            %(learning_tag)s,
-            %(hero_position)s,
-            %(preflop_call)s,
-            %(site)s,
-            %(game_type)s,
-            %(table_size)s,
-            %(street_reached)s,
-            %(result_amount)s,
-            %(result_bb)s,
-            %(preflop_open)s,
-            %(preflop_3bet)s,
-            %(preflop_4bet)s,
-            %(all_in)s,
-            %(currency)s,
-            %(parsed_at)s
-        )
+        for row in cur:
+            yield row
+
+# One enriched hands_silver row. Slots keep per-row memory flat during
+# backfills, and field order doubles as the INSERT column order.
+@dataclass(slots=True)
+class SilverRow:
+    hand_id: Any
+    user_id: Any
+    hand_date: Any
+    stakes_raw: Optional[str]
+    small_blind: Optional[Decimal]
+    big_blind: Optional[Decimal]
+    position_raw: Optional[str]
+    position_norm: Optional[str]
+    cards: Optional[str]
+    flop_cards: Optional[str]
+    turn_card: Optional[str]
+    river_card: Optional[str]
+    board: Optional[str]
+    hand_class: Optional[str]
+    gto_strategy: Optional[str]
+    exploit_deviation: Optional[str]
+    learning_tag: List[str]
+    hero_position: Optional[str]   # NEW
+    preflop_call: bool             # NEW
+    site: Optional[str]
+    game_type: str
+    table_size: Optional[int]
+    street_reached: str
+    result_amount: Optional[Decimal]
+    result_bb: Optional[Decimal]
+    preflop_open: bool
+    preflop_3bet: bool
+    preflop_4bet: bool
+    all_in: bool
+    currency: Optional[str]
+    parsed_at: Any
+
+SILVER_COLUMNS: Tuple[str, ...] = tuple(f.name for f in fields(SilverRow))
+
+_SILVER_CONFLICT_SQL = """
         ON CONFLICT (hand_id) DO UPDATE SET
             stakes_raw        = EXCLUDED.stakes_raw,
             small_blind       = EXCLUDED.small_blind,
@@ -867,14 +1200,79 @@ def upsert_silver_rows(conn, rows: List[Dict[str, Any]]) -> int:
             preflop_4bet      = EXCLUDED.preflop_4bet,
             all_in            = EXCLUDED.all_in,
             currency          = EXCLUDED.currency,
-            parsed_at         = EXCLUDED.parsed_at;
+            parsed_at         = EXCLUDED.parsed_at
+"""
+
+# At this size COPY into a staging table beats even the multi-VALUES insert:
+# no per-value quoting/parse on the server, just tab-separated framing.
+_SILVER_COPY_THRESHOLD = 200
+
+def upsert_silver_rows(conn, rows: List[SilverRow]) -> int:
+    if not rows:
+        return 0
+    if len(rows) >= _SILVER_COPY_THRESHOLD:
+        return _upsert_silver_rows_copy(conn, rows)
+    # One multi-VALUES statement per batch instead of a round-trip per row.
+    insert_sql = (
+        "INSERT INTO public.hands_silver (" + ", ".join(SILVER_COLUMNS) + ")\n"
+        "VALUES %s" + _SILVER_CONFLICT_SQL
+    )
+    values = [astuple(row) for row in rows]
+    with conn.cursor() as cur:
+        execute_values(cur, insert_sql, values, page_size=len(values))
+    return len(rows)
+
+def _pg_array_elem(x: Any) -> str:
+    if x is None:
+        return "NULL"
+    return '"' + str(x).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+def _copy_field(v: Any) -> str:
+    """Render one value in COPY text format (NULL marker, bool, text[], scalar)."""
+    if v is None:
+        return r"\N"
+    if isinstance(v, bool):
+        return "t" if v else "f"
+    if isinstance(v, (list, tuple)):
+        s = "{" + ",".join(_pg_array_elem(x) for x in v) + "}"
+    else:
+        s = str(v)
+    return (s.replace("\\", "\\\\")
+             .replace("\t", "\\t")
+             .replace("\n", "\\n")
+             .replace("\r", "\\r"))
+
+def _upsert_silver_rows_copy(conn, rows: List[SilverRow]) -> int:
     """
+    Backfill path: COPY the chunk into a temp staging table, then fold it
+    into hands_silver with one INSERT ... SELECT sharing the same conflict
+    clause as the execute_values path.
+    """
+    cols = ", ".join(SILVER_COLUMNS)
+    buf = io.StringIO()
+    for row in rows:
+        buf.write("\t".join(_copy_field(v) for v in astuple(row)))
+        buf.write("\n")
+    buf.seek(0)
     with conn.cursor() as cur:
-        for row in rows:
-            cur.execute(insert_sql, row)
+        cur.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS _silver_stage"
+            " (LIKE public.hands_silver INCLUDING DEFAULTS)"
+        )
+        cur.execute("TRUNCATE _silver_stage")
+        cur.copy_expert(f"COPY _silver_stage ({cols}) FROM STDIN", buf)
+        cur.execute(
+            f"INSERT INTO public.hands_silver ({cols})\n"
+            f"SELECT {cols} FROM _silver_stage" + _SILVER_CONFLICT_SQL
+        )
     return len(rows)
 
-def build_silver_payload(raw_row: Dict[str, Any]) -> Dict[str, Any]:
+@functools.lru_cache(maxsize=4096)
+def _header_features(header: str) -> Tuple[Optional[str], Optional[int]]:
+    """(site, table_size) derived from a hand's first two lines."""
+    return detect_site(header), detect_table_size(header)
+
+def build_silver_payload(raw_row: Dict[str, Any]) -> SilverRow:
     stakes_raw = raw_row.get("stakes_raw")
     position_raw = raw_row.get("position_raw")
     board_raw = raw_row.get("board")
@@ -885,8 +1283,9 @@ def build_silver_payload(raw_row: Dict[str, Any]) -> Dict[str, Any]:
         stakes_raw, sb_dec, bb_dec = extract_stakes_from_raw_text(raw_text)
     else:
         sb_dec, bb_dec = parse_stakes_from_string(stakes_raw)
-        if (sb_dec is None or bb_dec is None) and stakes_raw:
-            sb_dec, bb_dec = parse_stakes_from_string(stakes_raw)
+        if sb_dec is None or bb_dec is None:
+            # Unparseable stakes string: fall back to the hand text itself.
+            _, sb_dec, bb_dec = extract_stakes_from_raw_text(raw_text)
 
     # Cards/board from raw text if missing
     cards = raw_row.get("cards")
@@ -902,13 +1301,12 @@ def build_silver_payload(raw_row: Dict[str, Any]) -> Dict[str, Any]:
     # Position normalization from DB
     position_norm = normalize_position(position_raw)
 
-    # Position inference from seats + button (set hero_position & also as position_norm fallback)
     # Position inference from seats + button (set hero_position & also as position_norm fallback)
     inferred = infer_positions_from_text(raw_text or "")
     
     # Extract Hero Name to lookup in inferred dict
     hero_name = None
-    m_hero = re.search(r"^Dealt\s+to\s+(\S+)", raw_text or "", re.MULTILINE)
+    m_hero = DEALT_TO_RE.search(raw_text or "")
     if m_hero:
         hero_name = m_hero.group(1).strip()
         
@@ -922,10 +1320,15 @@ def build_silver_payload(raw_row: Dict[str, Any]) -> Dict[str, Any]:
         position_raw = hero_pos
         position_norm = hero_pos
 
-    # Site / type / size / street
-    site = detect_site(raw_text)
+    # Site / type / size / street. Site and table size live in the first two
+    # lines and repeat across a dump, so probe the memoized header first and
+    # only rescan the full text when the header gives nothing.
+    site, table_size = _header_features("\n".join((raw_text or "").split("\n", 2)[:2]))
+    if site is None:
+        site = detect_site(raw_text)
+    if table_size is None:
+        table_size = detect_table_size(raw_text)
     game_type = detect_game_type(raw_text)
-    table_size = detect_table_size(raw_text)
     street_reached = detect_street_reached(raw_text)
 
     # Actions (and preflop_call for VPIP)
@@ -935,9 +1338,10 @@ def build_silver_payload(raw_row: Dict[str, Any]) -> Dict[str, Any]:
     # Result (currency, amount cash, amount in BB)
     currency, result_cash, result_bb = detect_result(raw_text, bb_dec)
 
-    # If Bronze filled "board" only as a single string, split it
+    # If Bronze filled "board" only as a single string, split it.
+    # maxsplit stops tokenizing after the five cards we can use.
     if board_raw and (flop_cards is None and turn_card is None and river_card is None):
-        tokens = board_raw.split()
+        tokens = board_raw.split(maxsplit=4)
         if len(tokens) >= 3:
             flop_cards = " ".join(tokens[:3])
         if len(tokens) >= 4:
@@ -948,60 +1352,131 @@ def build_silver_payload(raw_row: Dict[str, Any]) -> Dict[str, Any]:
     # Normalize learning tags to stable keys
     learning_tag_norm = normalize_tags(raw_row.get("learning_tag"))
 
-    payload = {
-        "hand_id": raw_row.get("hand_id"),
-        "user_id": raw_row.get("user_id"),
-        "hand_date": raw_row.get("hand_date"),
-        "stakes_raw": stakes_raw,
-        "small_blind": sb_dec,
-        "big_blind": bb_dec,
-        "position_raw": position_raw,
-        "position_norm": position_norm,
-        "cards": cards,
-        "flop_cards": flop_cards,
-        "turn_card": turn_card,
-        "river_card": river_card,
-        "board": raw_row.get("board"),
-        "hand_class": raw_row.get("hand_class"),
-        "gto_strategy": raw_row.get("gto_strategy"),
-        "exploit_deviation": raw_row.get("exploit_deviation"),
-        "learning_tag": learning_tag_norm,
-        "hero_position": hero_pos or position_norm,  # NEW
-        "preflop_call": pre_call,                    # NEW
-        "site": site,
-        "game_type": game_type,
-        "table_size": table_size,
-        "street_reached": street_reached,
-        "result_amount": result_cash,
-        "result_bb": result_bb,
-        "preflop_open": pre_open,
-        "preflop_3bet": pre_3b,
-        "preflop_4bet": pre_4b,
-        "all_in": all_in,
-        "currency": currency,
-        "parsed_at": raw_row.get("parsed_at"),
-    }
-    return payload
+    return SilverRow(
+        hand_id=raw_row.get("hand_id"),
+        user_id=raw_row.get("user_id"),
+        hand_date=raw_row.get("hand_date"),
+        stakes_raw=stakes_raw,
+        small_blind=sb_dec,
+        big_blind=bb_dec,
+        position_raw=position_raw,
+        position_norm=position_norm,
+        cards=cards,
+        flop_cards=flop_cards,
+        turn_card=turn_card,
+        river_card=river_card,
+        board=raw_row.get("board"),
+        hand_class=raw_row.get("hand_class"),
+        gto_strategy=raw_row.get("gto_strategy"),
+        exploit_deviation=raw_row.get("exploit_deviation"),
+        learning_tag=learning_tag_norm,
+        hero_position=hero_pos or position_norm,  # NEW
+        preflop_call=pre_call,                    # NEW
+        site=site,
+        game_type=game_type,
+        table_size=table_size,
+        street_reached=street_reached,
+        result_amount=result_cash,
+        result_bb=result_bb,
+        preflop_open=pre_open,
+        preflop_3bet=pre_3b,
+        preflop_4bet=pre_4b,
+        all_in=all_in,
+        currency=currency,
+        parsed_at=raw_row.get("parsed_at"),
+    )
+
+# Below this many rows, process startup/pickling costs more than the regex
+# work it parallelizes; the steady-state 5-hand cycle always stays serial.
+_SILVER_POOL_THRESHOLD = 200
+
+def build_silver_payloads(raw_rows: List[Dict[str, Any]]) -> List[SilverRow]:
+    """
+    Enrich a chunk of raw rows. build_silver_payload is pure CPU (regex
+    scans + Decimal arithmetic, no DB access), so backfill-sized chunks
+    fan out across cores with a process pool.
+    """
+    if len(raw_rows) < _SILVER_POOL_THRESHOLD:
+        return [build_silver_payload(r) for r in raw_rows]
+    # Plain dicts pickle cheaply; RealDictRow drags cursor metadata along.
+    rows = [dict(r) for r in raw_rows]
+    with ProcessPoolExecutor() as ex:
+        return list(ex.map(build_silver_payload, rows, chunksize=32))
 
 # -----------------------------------------------------------------------------
 # Main runner
 # -----------------------------------------------------------------------------
-def run_once(batch_size: int = 5) -> None:
+def run_once(batch_size: int = 5, conn=None) -> int:
     logger.info("Starting coach_worker run_once with batch_size=%d", batch_size)
     load_env_file()
-    conn = get_pg_conn()
+    # Callers with a pooled/persistent connection pass it in; otherwise we
+    # open (and close) our own, as before.
+    own_conn = conn is None
+    if own_conn:
+        conn = get_pg_conn()
     try:
-        coach_new_hands(conn, batch_size)
-        raw_rows = fetch_unprocessed_hands(conn, batch_size)
-        if not raw_rows:
+        coached = coach_new_hands(conn, batch_size)
+        # Stream from the named cursor and flush in chunks, so only one
+        # chunk of payloads is ever in flight during large backfills.
+        inserted_count = 0
+        raw_chunk: List[Dict[str, Any]] = []
+        for raw_row in fetch_unprocessed_hands(conn, batch_size):
+            raw_chunk.append(raw_row)
+            if len(raw_chunk) >= 500:
+                inserted_count += upsert_silver_rows(conn, build_silver_payloads(raw_chunk))
+                raw_chunk = []
+        if raw_chunk:
+            inserted_count += upsert_silver_rows(conn, build_silver_payloads(raw_chunk))
+        if inserted_count:
+            logger.info("Upserted %d rows into hands_silver.", inserted_count)
+        else:
             logger.info("No new coached hands to move into silver.")
-            return
-        payload_rows = [build_silver_payload(r) for r in raw_rows]
-        inserted_count = upsert_silver_rows(conn, payload_rows)
-        logger.info("Upserted %d rows into hands_silver.", inserted_count)
+        return coached + inserted_count
     finally:
-        conn.close()
-        logger.info("Closed Postgres connection.")
+        if own_conn:
+            conn.close()
+            logger.info("Closed Postgres connection.")
+
+def run_loop(batch_size: int = 5) -> None:
+    """
+    Daemon mode: keep running batches, sleeping in proportion to how empty
+    the queue is. A full batch loops again immediately; an empty poll sleeps
+    the whole COACH_MAX_SLEEP interval, so an idle worker barely touches
+    Postgres.
+    """
+    load_env_file()
+    try:
+        max_sleep = float(os.getenv("COACH_MAX_SLEEP", "30"))
+    except ValueError:
+        max_sleep = 30.0
+    while True:
+        # Pooled connection: TLS/auth handshake is paid once, not per cycle.
+        with db.connection() as conn:
+            processed = run_once(batch_size=batch_size, conn=conn)
+            pause = max_sleep * max(0, batch_size - processed) / batch_size
+            if pause > 0:
+                logger.info("Waiting up to %.1fs for new hands.", pause)
+                wait_for_new_hands(conn, pause)
+
+def wait_for_new_hands(conn, timeout: float) -> None:
+    """
+    Idle wait that wakes early when the hands_notify_new trigger fires
+    (see the notify_new_hands migration). Falls back to a plain sleep if
+    LISTEN isn't available.
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("LISTEN new_hands;")
+        if select.select([conn], [], [], timeout)[0]:
+            conn.poll()
+            if conn.notifies:
+                logger.info("Woken by NOTIFY (%d pending).", len(conn.notifies))
+                conn.notifies.clear()
+        with conn.cursor() as cur:
+            cur.execute("UNLISTEN new_hands;")
+    except Exception as e:
+        logger.warning("LISTEN new_hands unavailable, sleeping instead: %s", e)
+        time.sleep(timeout)
 
 # -----------------------------------------------------------------------------
 # Entry point
@@ -1011,4 +1486,7 @@ if __name__ == "__main__":
         batch_size = int(os.getenv("COACH_BATCH_SIZE", "30"))
     except ValueError:
         batch_size = 5
-    run_once(batch_size=batch_size)
+    if os.getenv("COACH_LOOP", "false").lower() == "true":
+        run_loop(batch_size=batch_size)
+    else:
+        run_once(batch_size=batch_size)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Shared psycopg2 connection pool for the backend scripts.
+
+Each script used to open (and pay TLS + auth for) its own connection per
+run. Long-running callers (orchestrator, coach_worker daemon mode) should
+check connections out of this pool instead so the handshake is amortized
+across cycles.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import psycopg2
+import psycopg2.pool
+from psycopg2.extras import RealDictCursor
+
+_POOL: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+
+
+def get_db_url() -> str:
+    db_url = (
+        os.getenv("DATABASE_URL")
+        or os.getenv("SUPABASE_DB_URL")
+        or os.getenv("SUPABASE_DATABASE_URL")
+    )
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is missing")
+    return db_url
+
+
+def get_pool(minconn: int = 1, maxconn: int = 8) -> psycopg2.pool.ThreadedConnectionPool:
+    """Lazily build the process-wide pool on first use."""
+    global _POOL
+    if _POOL is None:
+        _POOL = psycopg2.pool.ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            get_db_url(),
+            cursor_factory=RealDictCursor,
+            keepalives=1,
+            keepalives_idle=30,
+        )
+    return _POOL
+
+
+@contextmanager
+def connection() -> Iterator:
+    """Check a connection out of the pool and return it when done."""
+    pool = get_pool()
+    conn = pool.getconn()
+    conn.autocommit = True
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def close_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.closeall()
+        _POOL = None
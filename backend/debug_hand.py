@@ -3,15 +3,9 @@ import os
 import psycopg2
 from psycopg2.extras import RealDictCursor
 
-# Load Env
-env_path = '.env'
-if os.path.exists(env_path):
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                k, v = line.split('=', 1)
-                os.environ[k.strip()] = v.strip()
+# Load Env (shared cached loader; resolves .env next to the backend scripts)
+from envutil import load_env_file
+load_env_file()
 
 db_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
 conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""Shared .env loader for the backend scripts."""
+
+import functools
+import os
+from typing import Optional
+
+from dotenv import dotenv_values
+
+
+@functools.lru_cache(maxsize=None)
+def load_env_file(path: Optional[str] = None) -> None:
+    """
+    Load key=value pairs from a .env file into os.environ without
+    clobbering variables that are already set. Cached per path so
+    repeated calls within one process only parse the file once.
+    """
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env")
+    if not os.path.exists(path):
+        return
+    for k, v in dotenv_values(path).items():
+        if k and v is not None:
+            os.environ.setdefault(k, v)
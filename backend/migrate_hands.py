@@ -1,77 +1,98 @@
 
+import io
+import json
 import os
 import re
 import psycopg2
-from psycopg2.extras import RealDictCursor, Json
+from concurrent.futures import ProcessPoolExecutor
+from psycopg2.extras import RealDictCursor
+from envutil import load_env_file
 from replayer_parser import parse_for_replayer, extract_date
 
-# Load Env
-env_path = 'backend/.env'
-if os.path.exists(env_path):
-    with open(env_path) as f:
-        for line in f:
-            line = line.strip()
-            if line and not line.startswith('#') and '=' in line:
-                k, v = line.split('=', 1)
-                if k not in os.environ:
-                    os.environ[k.strip()] = v.strip()
-
-db_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
-if not db_url:
-    print("No DB URL found.")
-    exit(1)
-
-conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
-conn.autocommit = True
-cur = conn.cursor()
-
-print("Fetching all hands...")
-cur.execute("SELECT id, raw_text FROM hands")
-hands = cur.fetchall()
-print(f"Found {len(hands)} hands. Starting re-parse...")
-
-count = 0
-errors = 0
+# Load Env (shared cached loader; resolves .env next to the backend scripts)
+load_env_file()
+
+# Flush updates in batches: COPY the parsed rows into a temp staging table
+# (the fastest Postgres write path — no per-row parse/plan), then fold them
+# into hands with one joined UPDATE per BATCH_SIZE hands.
+BATCH_SIZE = 500
+
+STAGE_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS staging_hands (
+        id uuid, data jsonb, date date, stakes text, position text, cards text
+    )
+"""
+STAGE_COPY = "COPY staging_hands (id, data, date, stakes, position, cards) FROM STDIN WITH (FORMAT text)"
+STAGE_UPDATE = """
+    UPDATE hands h
+    SET replayer_data = s.data,
+        date = s.date,
+        stakes = s.stakes,
+        position = s.position,
+        cards = s.cards
+    FROM staging_hands s
+    WHERE h.id = s.id
+"""
+
+
+def _copy_field(v):
+    """Render one value for COPY text format (tab-separated, \\N for NULL)."""
+    if v is None:
+        return r'\N'
+    s = v if isinstance(v, str) else str(v)
+    return (s.replace('\\', '\\\\')
+             .replace('\t', '\\t')
+             .replace('\n', '\\n')
+             .replace('\r', '\\r'))
+
+
+# Compiled once at module scope: the old code rebuilt hero-name f-string
+# patterns per hand, re-parsing a regex (and risking regex metacharacters in
+# player names) on every call.
+DEALT_RE = re.compile(r'Dealt to ([^\s\[]+)')
+BUTTON_RE = re.compile(r'Seat #(\d+) is the button')
+SEAT_LINE_RE = re.compile(r'Seat (\d+): (\S+)')
+
 
 def extract_position_from_raw(raw_text):
     """
     Extract hero's position from raw hand history using blind posts and seat positions.
     """
     # Extract hero name from "Dealt to [NAME]"
-    hero_match = re.search(r'Dealt to ([^\s\[]+)', raw_text)
+    hero_match = DEALT_RE.search(raw_text)
     if not hero_match:
         return None
     hero_name = hero_match.group(1)
-    
-    # MOST RELIABLE: Check if hero posted blinds
-    if re.search(rf'{hero_name} posts the small blind', raw_text):
+
+    # MOST RELIABLE: Check if hero posted blinds. Plain substring checks —
+    # no per-hand pattern build, and hero names with regex metacharacters
+    # can't break the match.
+    if f'{hero_name} posts the small blind' in raw_text:
         return 'SB'
-    if re.search(rf'{hero_name} posts the big blind', raw_text):
+    if f'{hero_name} posts the big blind' in raw_text:
         return 'BB'
-    
+
     # Extract button seat from "Seat #X is the button"
-    button_match = re.search(r'Seat #(\d+) is the button', raw_text)
+    button_match = BUTTON_RE.search(raw_text)
     if not button_match:
         return 'BTN'  # Default
-    
+
     button_seat = int(button_match.group(1))
-    
-    # Extract hero's seat from "Seat X: HeroName"
-    hero_seat_match = re.search(rf'Seat (\d+): {hero_name}', raw_text)
-    if not hero_seat_match:
+
+    # One pass over the seat lines gives both the roster and hero's seat.
+    seats = SEAT_LINE_RE.findall(raw_text)
+    hero_seat = next((int(num) for num, name in seats if name == hero_name), None)
+    if hero_seat is None:
         return 'BTN'
-    
-    hero_seat = int(hero_seat_match.group(1))
-    
+
     # If hero is on the button
     if hero_seat == button_seat:
         return 'BTN'
-    
+
     # Count seats to determine table size
-    seat_numbers = re.findall(r'Seat (\d+):', raw_text)
-    all_seats = sorted([int(s) for s in seat_numbers])
+    all_seats = sorted(int(num) for num, _ in seats)
     num_players = len(all_seats)
-    
+
     # Calculate position relative to button
     # For 6-max: BTN, SB, BB, UTG, HJ, CO
     try:
@@ -79,10 +100,10 @@ def extract_position_from_raw(raw_text):
         btn_idx = all_seats.index(button_seat)
     except ValueError:
         return 'BTN'
-    
+
     # Seats clockwise from button
     seats_from_btn = (hero_idx - btn_idx) % num_players
-    
+
     if seats_from_btn == 0:
         return 'BTN'
     elif num_players == 6:
@@ -98,50 +119,128 @@ def extract_position_from_raw(raw_text):
         # 9-max
         position_map = {8: 'CO', 7: 'HJ', 6: 'LJ', 5: 'MP', 4: 'UTG+1', 3: 'UTG'}
         return position_map.get(seats_from_btn, 'UTG')
-    
+
     return 'BTN'  # Safe fallback
 
-for h in hands:
-    hand_id = h['id']
-    raw = h['raw_text']
-    if not raw:
-        continue
-        
+
+def parse_row(raw_text):
+    """
+    Pure parse step for one hand: no DB handles, so it can run in a worker
+    process. Returns ((data, date_str, stakes, position, cards), None) or
+    (None, error_string) — errors travel back as values so one bad hand
+    doesn't abort the pool map.
+    """
     try:
-        data = parse_for_replayer(raw)
-        date_str = extract_date(raw)
+        data = parse_for_replayer(raw_text)
+        date_str = extract_date(raw_text)
 
         # Extract fields
         sb = data.get("sb")
         bb = data.get("bb")
         stakes = f"${sb}/${bb}" if sb and bb else None
-        
+
         # FIXED: Extract position correctly from raw text
-        position = extract_position_from_raw(raw)
-        
-        # Extract cards
-        hero = next((p for p in data.get("players", []) if p.get("isHero")), None)
+        position = extract_position_from_raw(raw_text)
+
+        # Extract cards (hero is attached at parse time; no players scan)
+        hero = data.get("hero")
         cards = None
         if hero and hero.get("cards"):
             cards = " ".join(hero["cards"])
 
-        # Update full row
-        cur.execute("""
-            UPDATE hands 
-            SET replayer_data = %s,
-                date = %s,
-                stakes = %s,
-                position = %s,
-                cards = %s
-            WHERE id = %s
-        """, (Json(data), date_str, stakes, position, cards, hand_id))
-        
-        count += 1
-        if count % 10 == 0:
-            print(f"Processed {count}...")
+        return (data, date_str, stakes, position, cards), None
     except Exception as e:
-        print(f"Error parsing hand {hand_id}: {e}")
-        errors += 1
+        return None, str(e)
+
+
+def main():
+    db_url = os.getenv('DATABASE_URL') or os.getenv('SUPABASE_DB_URL')
+    if not db_url:
+        print("No DB URL found.")
+        exit(1)
+
+    conn = psycopg2.connect(db_url, cursor_factory=RealDictCursor)
+    cur = conn.cursor()
+
+    # The re-parse is idempotent — on a crash we just rerun it — so skip the
+    # per-commit WAL flush wait. Session-level (not LOCAL) because each batch
+    # flush commits its own transaction.
+    cur.execute("SET synchronous_commit = OFF")
+
+    def flush_updates(pending):
+        if not pending:
+            return
+        buf = io.StringIO()
+        for hand_id, data, date_str, stakes, position, cards in pending:
+            buf.write("\t".join(_copy_field(v) for v in
+                                (hand_id, json.dumps(data), date_str, stakes, position, cards)))
+            buf.write("\n")
+        buf.seek(0)
+        cur.execute(STAGE_DDL)
+        cur.execute("TRUNCATE staging_hands")
+        cur.copy_expert(STAGE_COPY, buf)
+        cur.execute(STAGE_UPDATE)
+        conn.commit()
+
+    # Stream hands through a server-side named cursor instead of fetchall():
+    # Postgres hands rows over in itersize pages, so memory stays flat no
+    # matter how big the table is. withhold keeps the portal alive across
+    # the per-flush commits; writes go through the separate plain cursor.
+    print("Streaming hands...")
+    read_cur = conn.cursor(name='hand_stream', withhold=True)
+    read_cur.itersize = 1000
+    read_cur.execute("SELECT id, raw_text FROM hands")
+
+    count = 0
+    errors = 0
+    pending = []
+
+    def process_chunk(ex, chunk):
+        nonlocal count, errors, pending
+        results = ex.map(parse_row, (h['raw_text'] for h in chunk), chunksize=64)
+        for h, (parsed, err) in zip(chunk, results):
+            hand_id = h['id']
+            if err is not None:
+                print(f"Error parsing hand {hand_id}: {err}")
+                errors += 1
+                continue
+
+            data, date_str, stakes, position, cards = parsed
+
+            # Queue the row; flushed via COPY + joined UPDATE per BATCH_SIZE hands.
+            pending.append((hand_id, data, date_str, stakes, position, cards))
+            if len(pending) >= BATCH_SIZE:
+                flush_updates(pending)
+                pending = []
+
+            count += 1
+            # Progress every 1000 rows: each print takes the stdout lock and
+            # flushes; at every-10 cadence that IO shows up once parsing is
+            # spread across cores.
+            if count % 1000 == 0:
+                print(f"Processed {count}...")
+
+    # Parsing is CPU-bound pure Python, so spread it across cores; only the
+    # main process touches the connection, and results come back in order.
+    # Pool-map one cursor page at a time so raw_text blobs are never all
+    # resident at once.
+    with ProcessPoolExecutor() as ex:
+        chunk = []
+        for h in read_cur:
+            if not h['raw_text']:
+                continue
+            chunk.append(h)
+            if len(chunk) >= read_cur.itersize:
+                process_chunk(ex, chunk)
+                chunk = []
+        if chunk:
+            process_chunk(ex, chunk)
+
+    read_cur.close()
+    flush_updates(pending)
+    print(f"Migration Complete. Updated {count} hands. Errors: {errors}.")
+    conn.close()
+
 
-print(f"Migration Complete. Updated {count} hands. Errors: {errors}.")
-conn.close()
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ Role: Supervises the execution of dependent ETL (Extract, Transform, Load) stage
 """
 
 import os
+import re
 import sys
 import time
 import subprocess
@@ -31,6 +32,79 @@ logger = logging.getLogger(__name__)
 BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 PYTHON_EXE = sys.executable  # Use the same python interpreter running this script
 
+# Opt-in crash isolation: set PIPELINE_SUBPROCESS=true to run each stage in a
+# fresh interpreter (the old behavior). Default is in-process, which skips the
+# per-loop interpreter startup, SDK re-imports, and reconnects.
+SUBPROCESS_STAGES = os.getenv("PIPELINE_SUBPROCESS", "false").lower() == "true"
+
+
+def run_stage_inprocess(name, func, loop_until_empty=False, max_loops=50):
+    """
+    Run a pipeline stage by calling its entry point in this process.
+    If loop_until_empty is True, func must return the number of items it
+    processed; we rerun until it reports 0 — no stdout grepping needed.
+    """
+    logger.info(f"--- Starting Stage: {name} (in-process) ---")
+    try:
+        if not loop_until_empty:
+            func()
+            logger.info(f"Stage {name} completed successfully.")
+            return True
+
+        total_processed = 0
+        for loop in range(1, max_loops + 1):
+            logger.info(f"Loop {loop}/{max_loops} for {name}...")
+            count = func() or 0
+            total_processed += count
+            if count == 0:
+                logger.info(f"Stage {name} finished (Queue empty).")
+                break
+            logger.info(f"Processed {count} items. Continuing...")
+            time.sleep(1)  # Breathe
+
+        logger.info(f"Stage {name} completed. Total items processed: {total_processed}")
+        return True
+    except Exception as e:
+        logger.error(f"Stage {name} FAILED: {e}")
+        return False
+
+
+# Stage entry points. Imports are lazy so a missing optional SDK (boto3,
+# openai) only fails its own stage instead of the whole orchestrator.
+def _ingest_once():
+    from worker import main as worker_main
+    worker_main()
+
+
+def _coach_once():
+    # Borrow a pooled connection so continuous mode pays the TLS + auth
+    # handshake once per process, not once per Analysis loop iteration.
+    # Batch size mirrors coach_worker's __main__ block so the in-process
+    # stage processes as many hands per loop as the old subprocess did.
+    from coach_worker import run_once as coach_run_once
+    from db import connection
+    try:
+        batch_size = int(os.getenv("COACH_BATCH_SIZE", "30"))
+    except ValueError:
+        batch_size = 5
+    with connection() as conn:
+        return coach_run_once(batch_size=batch_size, conn=conn)
+
+
+def _index_once():
+    from study_ingest import run_once as study_run_once
+    return study_run_once()
+
+
+def _close_db_pool():
+    """Release the shared pool's connections on shutdown."""
+    try:
+        from db import close_pool
+        close_pool()
+    except Exception as e:
+        logger.warning(f"Closing DB pool failed: {e}")
+
+
 def run_stage(name, script_name, loop_until_empty=False, max_loops=50):
     """
     Run a pipeline stage (script).
@@ -86,7 +160,6 @@ def run_stage(name, script_name, loop_until_empty=False, max_loops=50):
                 
                 # Try to extract count (optional, just for logging)
                 # "Coached 5 hands this run"
-                import re
                 match = re.search(r"Coached (\d+) hands", output)
                 count = int(match.group(1)) if match else 0
                 total_processed += count
@@ -108,24 +181,41 @@ def run_stage(name, script_name, loop_until_empty=False, max_loops=50):
 
 def run_pipeline_once():
     """Run one complete pipeline cycle."""
-    # 1. Ingestion (Bronze Layer)
-    # Fetches new files from S3 and puts them in 'hands' table
-    if not run_stage("Ingestion", "worker.py"):
+    if SUBPROCESS_STAGES:
+        # 1. Ingestion (Bronze Layer)
+        # Fetches new files from S3 and puts them in 'hands' table
+        if not run_stage("Ingestion", "worker.py"):
+            logger.error("Ingestion failed.")
+            return False
+
+        # 2. Enrichment/Analysis (Gold Layer)
+        # Loops coach_worker to process all pending hands with Multi-Agent Model
+        if not run_stage("Analysis", "coach_worker.py", loop_until_empty=True):
+            logger.error("Analysis failed.")
+            return False
+
+        # 3. Indexing (Study Layer)
+        # Updates embeddings for the Chat/Study feature
+        if not run_stage("Indexing", "study_ingest.py", loop_until_empty=True, max_loops=10):
+            logger.error("Indexing failed.")
+            return False
+
+        return True
+
+    # Same three stages, called in-process: run_once returns the processed
+    # count, so the looping stages stop on 0 instead of grepping stdout.
+    if not run_stage_inprocess("Ingestion", _ingest_once):
         logger.error("Ingestion failed.")
         return False
-        
-    # 2. Enrichment/Analysis (Gold Layer)
-    # Loops coach_worker to process all pending hands with Multi-Agent Model
-    if not run_stage("Analysis", "coach_worker.py", loop_until_empty=True):
+
+    if not run_stage_inprocess("Analysis", _coach_once, loop_until_empty=True):
         logger.error("Analysis failed.")
         return False
-        
-    # 3. Indexing (Study Layer)
-    # Updates embeddings for the Chat/Study feature
-    if not run_stage("Indexing", "study_ingest.py", loop_until_empty=True, max_loops=10):
+
+    if not run_stage_inprocess("Indexing", _index_once, loop_until_empty=True, max_loops=10):
         logger.error("Indexing failed.")
         return False
-    
+
     return True
 
 
@@ -151,7 +241,10 @@ def main():
     
     if single_run:
         logger.info("Pipeline running in SINGLE mode.")
-        run_pipeline_once()
+        try:
+            run_pipeline_once()
+        finally:
+            _close_db_pool()
         logger.info("Pipeline execution FINISHED.")
         return
     
@@ -180,6 +273,7 @@ def main():
             logger.info(f"Sleeping {sleep_interval}s before next cycle...")
             time.sleep(sleep_interval)
     
+    _close_db_pool()
     logger.info("Pipeline shutdown complete.")
 
 
@@ -929,9 +929,13 @@ def parse_for_replayer(raw_text: str) -> Dict[str, Any]:
     pot = extract_pot(raw_text)
     folded = identify_folded_players(actions, shown_cards)  # Pass showdown data to infer folds
     
-    # Assign cards to players
+    # Assign cards to players (and grab the hero entry while we're already
+    # walking the list, so callers don't re-scan players for it)
+    hero_player = None
     for player in players:
         name = player["name"]
+        if player["isHero"]:
+            hero_player = player
         if player["isHero"] and hero_cards:
             player["cards"] = hero_cards
         elif name in shown_cards:
@@ -970,6 +974,9 @@ def parse_for_replayer(raw_text: str) -> Dict[str, Any]:
         "bb": bb,
         "dealerSeat": dealer_seat,
         "actions": actions,
+        # Same dict as the matching players entry — O(1) hero lookup for
+        # downstream consumers instead of a scan over players.
+        "hero": hero_player,
     }
 
 
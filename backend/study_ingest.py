@@ -216,12 +216,14 @@ def insert_chunks(rows: List[Dict[str, Any]]) -> int:
     return len(rows)
 
 
-def run_once(batch_size: int = 20) -> None:
+def run_once(batch_size: int = 20) -> int:
+    """Index one batch; returns the number of rows inserted so callers
+    (the orchestrator) can loop until the queue drains."""
     logger.info("study_ingest: starting, batch_size=%d", batch_size)
     hands = fetch_new_hands(batch_size)
     if not hands:
         logger.info("study_ingest: no new coached hands to index.")
-        return
+        return 0
 
     prepared_rows: List[Dict[str, Any]] = []
     for h in hands:
@@ -244,6 +246,7 @@ def run_once(batch_size: int = 20) -> None:
 
     inserted = insert_chunks(prepared_rows)
     logger.info("study_ingest: inserted %d study_chunks rows.", inserted)
+    return inserted
 
 
 # --------------------------------------------------------------------- entrypoint
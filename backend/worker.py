@@ -168,7 +168,7 @@ def insert_hands(user_id, blocks):
             bb = data.get("bb")
             stakes = f"${sb}/${bb}" if sb and bb else None
             
-            hero = next((p for p in data.get("players", []) if p.get("isHero")), None)
+            hero = data.get("hero")  # attached at parse time; no players scan
             position = None
             cards = None
             board = None
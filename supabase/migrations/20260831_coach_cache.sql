@@ -0,0 +1,14 @@
+-- Migration: Coach response cache
+-- Purpose: the coach API call is the most expensive step of the pipeline;
+--          re-uploads and duplicate hands should hit a cache instead of the
+--          LLM endpoint again.
+-- Date: 2026-08-31
+
+-- Keyed by a content hash over (raw_text, stakes, position, cards, board),
+-- computed by coach_worker. The full API response is stored so enhanced
+-- coaching fields survive a cache hit.
+CREATE TABLE IF NOT EXISTS coach_cache (
+    hash BYTEA PRIMARY KEY,
+    response JSONB NOT NULL,
+    created_at TIMESTAMPTZ DEFAULT now()
+);
@@ -0,0 +1,14 @@
+-- Migration: ordered index for the coach claim query
+-- Purpose: CLAIM_HANDS_SQL orders pending hands by
+--          COALESCE(date, created_at::date), id before LIMIT, which forces
+--          a sort of the whole pending set each poll. Indexing the exact
+--          expression over the claim predicate lets the LIMIT pop straight
+--          off the btree.
+-- Date: 2026-08-31
+
+-- Partial on the same WHERE as the claim CTE, so only claimable rows are
+-- kept and they drop out as soon as gto_strategy is written.
+CREATE INDEX IF NOT EXISTS idx_hands_claim_order
+ON hands ((COALESCE(date, created_at::date)), id)
+WHERE gto_strategy IS NULL
+  AND raw_text IS NOT NULL;
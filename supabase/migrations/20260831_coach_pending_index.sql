@@ -0,0 +1,12 @@
+-- Migration: Partial index for the coach worker's pending-hands poll
+-- Purpose: coach_worker polls `WHERE gto_strategy IS NULL` every cycle; on a
+--          growing hands table that is a scan over mostly-coached rows.
+-- Date: 2026-08-31
+
+-- Only uncoached hands live in this index, so the poll becomes a small index
+-- range scan. Rows drop out automatically once gto_strategy is written.
+-- Note: sentinel values like 'TEMP_SKIP' are NOT NULL, so marked hands are
+-- excluded from the index (and from the poll) as intended.
+CREATE INDEX IF NOT EXISTS idx_hands_pending_by_created
+ON hands (created_at)
+WHERE gto_strategy IS NULL;
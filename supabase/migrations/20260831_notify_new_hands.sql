@@ -0,0 +1,16 @@
+-- Migration: NOTIFY on new hands
+-- Purpose: let the coach worker's daemon loop wake on insert instead of
+--          waiting out its full polling interval.
+-- Date: 2026-08-31
+
+CREATE OR REPLACE FUNCTION notify_new_hand() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify('new_hands', NEW.id::text);
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS hands_notify_new ON hands;
+CREATE TRIGGER hands_notify_new
+AFTER INSERT ON hands
+FOR EACH ROW EXECUTE FUNCTION notify_new_hand();
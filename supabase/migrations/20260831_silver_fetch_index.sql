@@ -0,0 +1,12 @@
+-- Migration: index for the Silver fetch anti-join
+-- Purpose: let fetch_unprocessed_hands walk coached hands in
+--          (hand_date, id) order straight off an index instead of
+--          sorting the table each cycle. Partial on the worker's
+--          predicate so uncoached/in-progress rows stay out of it;
+--          the hands_silver PK already serves the NOT EXISTS probe.
+-- Date: 2026-08-31
+
+CREATE INDEX IF NOT EXISTS idx_hands_silver_fetch
+ON hands ((COALESCE(date, created_at::date)), id)
+WHERE gto_strategy IS NOT NULL
+  AND gto_strategy <> 'IN_PROGRESS';